@@ -5,11 +5,20 @@ Arkain.io 自动签到脚本 - 使用Selenium浏览器自动化
 """
 
 import os
+import sys
 import time
 import json
+import signal
+import stat
+import atexit
 import logging
+import getpass
+import tempfile
+import threading
 from datetime import datetime
 import re
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -19,6 +28,7 @@ from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 import requests
+import psutil
 
 # 配置日志
 logging.basicConfig(
@@ -33,6 +43,38 @@ PASSWORD = os.getenv("ARKAIN_PASSWORD")
 TG_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TG_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
+# 预检配置：启动浏览器前探测站点可达性
+PREFLIGHT_URLS = [
+    "https://account.arkain.io",
+    "https://arkain.io"
+]
+# 所有端点共用的总时限（秒），超时未返回的端点直接判定为不可达；探测结果不做缓存，每次运行都重新探测
+PREFLIGHT_TIMEOUT = float(os.getenv("ARKAIN_PREFLIGHT_TIMEOUT", "1.0"))
+# 仅网关类错误视为站点不可用，405/501等只说明不支持该请求方法
+PREFLIGHT_DOWN_STATUS = {502, 503, 504}
+
+# 浏览器进程守护配置
+# 内存按PSS（Linux）或USS（其他平台）统计，共享页按比例分摊、不重复计算，无权限读取时退回RSS
+CHROME_MEMORY_LIMIT_MB = int(os.getenv("ARKAIN_CHROME_MEMORY_LIMIT_MB", "1536"))
+GUARD_INTERVAL = float(os.getenv("ARKAIN_GUARD_INTERVAL", "2"))
+MAX_RESTARTS = int(os.getenv("ARKAIN_MAX_RESTARTS", "1"))
+# PID目录按用户隔离，避免其他用户写入记录诱导清理任意进程
+PID_DIR = os.getenv(
+    "ARKAIN_PID_DIR",
+    os.path.join(tempfile.gettempdir(), f"arkain_checkin-{os.getuid() if hasattr(os, 'getuid') else getpass.getuser()}")
+)
+# 只允许清理名称匹配的浏览器相关进程
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "chromedriver")
+
+# 站点配置文件：选择器、关键词、匹配模式和URL
+SITE_PROFILE_PATH = os.getenv(
+    "ARKAIN_SITE_PROFILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_profiles.json")
+)
+SITE_PROFILE_SCHEMA_VERSION = 1
+# 检测到的配置选择器用完后，尝试祖先配置其余选择器时使用的等待超时
+FALLBACK_SELECTOR_TIMEOUT = float(os.getenv("ARKAIN_FALLBACK_SELECTOR_TIMEOUT", "2"))
+
 def send_telegram(message):
     """发送Telegram通知"""
     if not TG_TOKEN or not TG_CHAT_ID:
@@ -54,11 +96,386 @@ def send_telegram(message):
     except Exception as e:
         logger.error(f"发送Telegram通知时出错: {e}")
 
+def probe_endpoint(url, deadline):
+    """探测单个端点，返回(是否可达, 详情)
+    
+    先发HEAD请求；仅当HEAD返回502/503/504时再用GET确认一次，
+    超时和连接失败换请求方法也不会恢复，直接判定不可达。
+    """
+    details = []
+    for method in ("HEAD", "GET"):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            details.append(f"{method} 超出预检时限")
+            break
+        try:
+            # 连接和读取分别计时，两者都限制在剩余时间内
+            with requests.request(method, url, timeout=(remaining, remaining), allow_redirects=False, stream=True) as response:
+                status = response.status_code
+        except requests.exceptions.Timeout:
+            details.append(f"{method} 超时")
+            break
+        except requests.exceptions.RequestException as e:
+            details.append(f"{method} 连接失败: {e.__class__.__name__}")
+            break
+        
+        details.append(f"{method} HTTP {status}")
+        if status not in PREFLIGHT_DOWN_STATUS:
+            return True, "; ".join(details)
+    return False, "; ".join(details)
+
+def preflight_check(urls=PREFLIGHT_URLS, timeout=PREFLIGHT_TIMEOUT):
+    """并发探测所有端点，总耗时不超过timeout，返回不可达端点列表 [(url, 详情), ...]"""
+    logger.info("预检站点可达性...")
+    deadline = time.monotonic() + timeout
+    executor = ThreadPoolExecutor(max_workers=len(urls))
+    futures = [executor.submit(probe_endpoint, url, deadline) for url in urls]
+    wait(futures, timeout=timeout)
+    # 不等待仍在进行的请求，它们会在各自的超时后自行结束
+    executor.shutdown(wait=False)
+    
+    results = [future.result() if future.done() else (False, f"超出预检时限 ({timeout}s)") for future in futures]
+    
+    failures = []
+    for url, (reachable, detail) in zip(urls, results):
+        if reachable:
+            logger.info(f"端点可达: {url} ({detail})")
+        else:
+            logger.error(f"端点不可达: {url} ({detail})")
+            failures.append((url, detail))
+    return failures
+
+class SiteProfile:
+    """预编译的站点配置：选择器组、关键词和合并后的正则"""
+
+    def __init__(self, name, data, parent=None):
+        self.name = name
+        self.version = data.get("version", "")
+        self.parent = parent
+        fingerprint = data.get("fingerprint", {})
+        self.url_markers = tuple(fingerprint.get("url_contains", []))
+        self.page_markers = tuple(fingerprint.get("page_contains", []))
+        
+        # URL、关键词、模式和选择器均按组整体继承，子配置定义的组完全替换父配置的同名组
+        raw_urls = dict(parent.raw_urls) if parent else {}
+        raw_urls.update(data.get("urls", {}))
+        self.raw_urls = raw_urls
+        
+        self._keywords = dict(parent._keywords) if parent else {}
+        for group, words in data.get("keywords", {}).items():
+            self._keywords[group] = tuple(word.lower() for word in words)
+        
+        self._patterns = dict(parent._patterns) if parent else {}
+        for group, patterns in data.get("patterns", {}).items():
+            self._patterns[group] = re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+        
+        self._selectors = dict(parent._selectors) if parent else {}
+        self._fallback_selectors = dict(parent._fallback_selectors) if parent else {}
+        for group, selectors in data.get("selectors", {}).items():
+            own = tuple(self._locator(selector) for selector in selectors)
+            inherited = parent.selectors(group) + parent.fallback_selectors(group) if parent else ()
+            self._selectors[group] = own
+            # 祖先配置中的其余选择器仅在自身选择器全部用完后使用
+            fallback = []
+            for locator in inherited:
+                if locator not in own and locator not in fallback:
+                    fallback.append(locator)
+            self._fallback_selectors[group] = tuple(fallback)
+
+    @staticmethod
+    def _locator(selector):
+        """以//开头的视为XPath，其余视为CSS选择器"""
+        return (By.XPATH, selector) if selector.startswith("//") else (By.CSS_SELECTOR, selector)
+
+    def matches(self, url, page_source):
+        """根据URL和页面源码判断是否为该配置对应的站点版本"""
+        if not self.url_markers and not self.page_markers:
+            return False
+        if self.url_markers and not any(marker in url for marker in self.url_markers):
+            return False
+        return all(marker in page_source for marker in self.page_markers)
+
+    def url(self, name):
+        value = self.raw_urls[name]
+        return value.format(base=self.raw_urls["base"], console=self.raw_urls["console"])
+
+    def urls(self, name):
+        return [url.format(base=self.raw_urls["base"], console=self.raw_urls["console"]) for url in self.raw_urls[name]]
+
+    def selectors(self, group):
+        return self._selectors.get(group, ())
+
+    def fallback_selectors(self, group):
+        return self._fallback_selectors.get(group, ())
+
+    def keywords(self, group):
+        return self._keywords.get(group, ())
+
+    def pattern(self, group):
+        return self._patterns[group]
+
+    def has_keyword(self, group, text):
+        text = text.lower()
+        return any(keyword in text for keyword in self.keywords(group))
+
+class SiteProfiles:
+    """站点配置集合，负责按页面指纹选择配置"""
+
+    def __init__(self, data):
+        schema_version = data.get("schema_version")
+        if schema_version != SITE_PROFILE_SCHEMA_VERSION:
+            raise ValueError(f"不支持的站点配置版本: {schema_version}")
+        
+        raw_profiles = data["profiles"]
+        self.profiles = {}
+        
+        def build(name, chain=()):
+            if name in self.profiles:
+                return self.profiles[name]
+            if name in chain:
+                raise ValueError(f"站点配置存在循环继承: {name}")
+            raw = raw_profiles[name]
+            parent = build(raw["extends"], chain + (name,)) if raw.get("extends") else None
+            self.profiles[name] = SiteProfile(name, raw, parent)
+            return self.profiles[name]
+        
+        for name in raw_profiles:
+            build(name)
+        self.default = self.profiles[data["default_profile"]]
+
+    def detect(self, url, page_source):
+        """返回与当前页面指纹匹配的配置，无匹配时返回默认配置"""
+        for profile in self.profiles.values():
+            if profile.matches(url, page_source):
+                return profile
+        return self.default
+
+@lru_cache(maxsize=None)
+def load_site_profiles(path=SITE_PROFILE_PATH):
+    """加载并编译站点配置文件，每个进程只执行一次"""
+    with open(path, encoding="utf-8") as f:
+        profiles = SiteProfiles(json.load(f))
+    logger.info(f"已加载站点配置: {path} ({', '.join(profiles.profiles)})")
+    return profiles
+
+class ResourceLimitExceeded(Exception):
+    """浏览器进程树内存超出上限"""
+
+def _is_browser_process(proc):
+    """判断进程名或启动命令是否为chrome/chromium/chromedriver"""
+    try:
+        cmdline = proc.cmdline()
+        names = [proc.name()] + ([os.path.basename(cmdline[0])] if cmdline else [])
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+    return any(keyword in name.lower() for name in names for keyword in BROWSER_PROCESS_NAMES)
+
+def _secure_pid_dir(pid_dir):
+    """创建权限为0700的PID目录，目录不属于当前用户或权限过宽时返回False"""
+    try:
+        os.makedirs(pid_dir, mode=0o700, exist_ok=True)
+        st = os.lstat(pid_dir)
+        if not stat.S_ISDIR(st.st_mode):
+            raise PermissionError("不是普通目录")
+        if hasattr(os, "getuid"):
+            if st.st_uid != os.getuid():
+                raise PermissionError(f"目录属于其他用户 (uid {st.st_uid})")
+            if st.st_mode & 0o077:
+                os.chmod(pid_dir, 0o700)
+        return True
+    except OSError as e:
+        logger.error(f"PID目录 {pid_dir} 不安全，跳过进程记录和清理: {e}")
+        return False
+
+def _kill_processes(entries, timeout=3):
+    """结束进程列表 [(pid, 创建时间), ...]，创建时间不符或非浏览器的进程跳过"""
+    procs = []
+    for pid, create_time in entries:
+        if pid == os.getpid():
+            continue
+        try:
+            proc = psutil.Process(pid)
+            if abs(proc.create_time() - create_time) > 1:
+                continue
+            if not _is_browser_process(proc):
+                logger.warning(f"PID {pid} 不是浏览器进程，跳过清理")
+                continue
+            proc.terminate()
+            procs.append(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    
+    if not procs:
+        return 0
+    
+    _, alive = psutil.wait_procs(procs, timeout=timeout)
+    for proc in alive:
+        try:
+            proc.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return len(procs)
+
+def _owner_alive(owner_pid, owner_create_time):
+    """判断PID文件的所属进程是否仍在运行"""
+    try:
+        return abs(psutil.Process(owner_pid).create_time() - owner_create_time) <= 1
+    except psutil.NoSuchProcess:
+        return False
+    except psutil.AccessDenied:
+        logger.warning(f"无权访问PID文件所属进程 {owner_pid}，视为仍在运行，跳过清理")
+        return True
+
+def _process_memory(proc):
+    """返回进程的实际内存占用：Linux用PSS，其他平台用USS，无权限读取时退回RSS"""
+    try:
+        info = proc.memory_full_info()
+        return getattr(info, "pss", info.uss)
+    except psutil.AccessDenied:
+        return proc.memory_info().rss
+
+def reap_orphans(pid_dir=PID_DIR, include_self=False):
+    """清理之前运行遗留的Chrome/chromedriver进程"""
+    if not os.path.lexists(pid_dir) or not _secure_pid_dir(pid_dir):
+        return
+    
+    for name in os.listdir(pid_dir):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(pid_dir, name)
+        try:
+            with open(path) as f:
+                record = json.load(f)
+            owner_pid = record["owner_pid"]
+            if owner_pid == os.getpid():
+                if not include_self:
+                    continue
+            elif _owner_alive(owner_pid, record["owner_create_time"]):
+                continue
+            
+            entries = [(int(pid), create_time) for pid, create_time in record["processes"].items()]
+            killed = _kill_processes(entries)
+            if killed:
+                logger.warning(f"已清理遗留浏览器进程 {killed} 个 (来自PID {owner_pid})")
+            os.remove(path)
+        except Exception as e:
+            logger.debug(f"清理PID文件 {path} 失败: {e}")
+
+def install_signal_handlers():
+    """收到终止信号时清理浏览器进程后退出"""
+    def handle_signal(signum, frame):
+        logger.warning(f"收到信号 {signum}，清理浏览器进程后退出")
+        reap_orphans(include_self=True)
+        sys.exit(128 + signum)
+    
+    for name in ("SIGTERM", "SIGHUP"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), handle_signal)
+    atexit.register(reap_orphans, include_self=True)
+
+class ProcessGuard:
+    """跟踪WebDriver整个进程树，限制内存占用并在退出时清理"""
+
+    def __init__(self, memory_limit_mb=CHROME_MEMORY_LIMIT_MB, interval=GUARD_INTERVAL, pid_dir=PID_DIR):
+        self.memory_limit = memory_limit_mb * 1024 * 1024
+        self.interval = interval
+        self.pid_file = os.path.join(pid_dir, f"{os.getpid()}.json")
+        self.root_pid = None
+        self.tracked = {}  # pid -> 创建时间
+        self.limit_exceeded = False
+        self.exceeded_memory = 0
+        self._persist = _secure_pid_dir(pid_dir)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def attach(self, root_pid):
+        """开始跟踪以root_pid为根的进程树"""
+        self.root_pid = root_pid
+        self.refresh()
+        self._thread = threading.Thread(target=self._monitor, name="chrome-guard", daemon=True)
+        self._thread.start()
+        logger.info(f"进程守护已启动: 根PID {root_pid}, 内存上限 {self.memory_limit // (1024 * 1024)}MB")
+
+    def refresh(self):
+        """刷新进程树并写入PID文件，返回当前存活的进程"""
+        try:
+            root = psutil.Process(self.root_pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            procs = []
+        
+        alive = []
+        with self._lock:
+            for proc in procs:
+                try:
+                    self.tracked.setdefault(proc.pid, proc.create_time())
+                    alive.append(proc)
+                except psutil.NoSuchProcess:
+                    continue
+            self._save()
+        return alive
+
+    def _save(self):
+        if not self._persist:
+            return
+        record = {
+            "owner_pid": os.getpid(),
+            "owner_create_time": psutil.Process().create_time(),
+            "processes": {str(pid): create_time for pid, create_time in self.tracked.items()}
+        }
+        with open(self.pid_file, "w") as f:
+            json.dump(record, f)
+
+    def _monitor(self):
+        while not self._stop.wait(self.interval):
+            try:
+                memory = 0
+                for proc in self.refresh():
+                    try:
+                        memory += _process_memory(proc)
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+                
+                if memory > self.memory_limit:
+                    logger.error(f"浏览器进程树内存 {memory // (1024 * 1024)}MB 超出上限 {self.memory_limit // (1024 * 1024)}MB，终止浏览器")
+                    self.exceeded_memory = memory
+                    self.limit_exceeded = True
+                    self.kill_tree()
+                    return
+            except Exception as e:
+                logger.debug(f"进程守护检查失败: {e}")
+
+    def kill_tree(self):
+        """结束所有跟踪的进程，返回结束的进程数"""
+        with self._lock:
+            entries = list(self.tracked.items())
+        killed = _kill_processes(entries)
+        with self._lock:
+            self.tracked.clear()
+            if os.path.exists(self.pid_file):
+                os.remove(self.pid_file)
+        return killed
+
+    def limit_message(self):
+        """内存超限的描述，用于通知"""
+        return f"浏览器进程树内存 {self.exceeded_memory // (1024 * 1024)}MB 超出上限 {self.memory_limit // (1024 * 1024)}MB"
+
+    def release(self):
+        """停止监控并清理残留进程"""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1)
+        killed = self.kill_tree()
+        if killed:
+            logger.warning(f"已清理残留浏览器进程 {killed} 个")
+
 class ArkainSession:
     def __init__(self):
         self.driver = None
-        self.base_url = "https://account.arkain.io"
-        self.console_url = "https://arkain.io"
+        self.site_profiles = load_site_profiles()
+        self.profile = self.site_profiles.default
+        self.guard = ProcessGuard()
         self.setup_driver()
 
     def setup_driver(self):
@@ -139,6 +556,13 @@ class ArkainSession:
             if self.driver:
                 self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
                 logger.info("Chrome WebDriver初始化成功")
+                
+                # 跟踪chromedriver及其启动的Chrome进程树
+                service_process = getattr(getattr(self.driver, "service", None), "process", None)
+                if service_process:
+                    self.guard.attach(service_process.pid)
+                else:
+                    logger.warning("无法获取chromedriver进程，进程守护未启动")
             else:
                 raise Exception("WebDriver初始化失败：driver对象为空")
                 
@@ -153,35 +577,11 @@ class ArkainSession:
         # 等待页面稳定
         time.sleep(2)
         
-        # 常见的弹窗关闭按钮选择器
-        popup_close_selectors = [
-            # X关闭按钮
-            "//button[contains(text(), '×')]",
-            "//button[contains(text(), '✕')]",
-            "//button[contains(@class, 'close')]",
-            "//button[contains(@aria-label, 'close')]",
-            "//button[contains(@aria-label, 'Close')]",
-            "//span[contains(@class, 'close')]",
-            "//span[contains(@aria-label, 'close')]",
-            "//div[contains(@class, 'close')]",
-            "//div[contains(@aria-label, 'close')]",
-            # 通用关闭按钮
-            "//button[contains(text(), 'Close')]",
-            "//button[contains(text(), 'close')]",
-            "//button[contains(text(), '关闭')]",
-            "//a[contains(text(), 'Close')]",
-            "//a[contains(text(), 'close')]",
-            "//a[contains(text(), '关闭')]",
-            # 覆盖层点击关闭
-            "//div[contains(@class, 'modal-backdrop')]",
-            "//div[contains(@class, 'overlay')]",
-            "//div[contains(@class, 'popup-overlay')]"
-        ]
-        
+        # 常见的弹窗关闭按钮选择器（见站点配置）
         popup_closed = False
-        for selector in popup_close_selectors:
+        for by, selector, _ in self.locators("popup_close"):
             try:
-                elements = self.driver.find_elements(By.XPATH, selector)
+                elements = self.driver.find_elements(by, selector)
                 for element in elements:
                     if element.is_displayed() and element.is_enabled():
                         try:
@@ -250,37 +650,40 @@ class ArkainSession:
             logger.error(f"在{description}输入文本失败: {e}")
             return False
 
+    def locators(self, group, timeout=10):
+        """依次给出选择器组中的(定位方式, 选择器, 超时)，当前配置的选择器全部用完后才以短超时尝试回退选择器"""
+        for by, selector in self.profile.selectors(group):
+            yield by, selector, timeout
+        
+        fallback = self.profile.fallback_selectors(group)
+        if fallback:
+            logger.info(f"站点配置 {self.profile.name} 的 {group} 选择器已用完，尝试回退选择器")
+        for by, selector in fallback:
+            yield by, selector, min(timeout, FALLBACK_SELECTOR_TIMEOUT)
+
     def login(self, email, password):
         """登录Arkain账户"""
         logger.info("开始登录Arkain账户...")
         
         try:
             # 访问登录页面
-            logger.info(f"访问登录页面: {self.base_url}/login")
-            self.driver.get(f"{self.base_url}/login")
+            login_url = self.profile.url("login")
+            logger.info(f"访问登录页面: {login_url}")
+            self.driver.get(login_url)
             time.sleep(3)  # 等待页面加载
             
             # 检查是否已经在登录页面
             current_url = self.driver.current_url
             logger.info(f"当前页面URL: {current_url}")
             
-            # 尝试多种方式找到邮箱输入框
-            email_selectors = [
-                "//input[@id='email-input']",
-                "//input[@type='email']",
-                "//input[@name='email']",
-                "//input[@id='email']",
-                "//input[contains(@placeholder, 'email')]",
-                "//input[contains(@placeholder, 'Email')]",
-                "//input[contains(@aria-label, 'email')]",
-                "//input[contains(@class, 'email')]",
-                "//input[contains(@name, 'email')]",
-                "//input[contains(@id, 'email')]"
-            ]
+            # 根据页面指纹选择站点配置
+            self.profile = self.site_profiles.detect(current_url, self.driver.page_source)
+            logger.info(f"使用站点配置: {self.profile.name} (v{self.profile.version})")
             
+            # 尝试多种方式找到邮箱输入框
             email_found = False
-            for selector in email_selectors:
-                if self.wait_and_type(selector, email, description="邮箱输入框"):
+            for by, selector, timeout in self.locators("email_input"):
+                if self.wait_and_type(selector, email, by=by, timeout=timeout, description="邮箱输入框"):
                     email_found = True
                     break
             
@@ -289,18 +692,9 @@ class ArkainSession:
                 return False
             
             # 尝试多种方式找到密码输入框
-            password_selectors = [
-                "//input[@id='password-input']",
-                "//input[@type='password']",
-                "//input[@name='password']",
-                "//input[@id='password']",
-                "//input[contains(@placeholder, 'password')]",
-                "//input[contains(@placeholder, 'Password')]"
-            ]
-            
             password_found = False
-            for selector in password_selectors:
-                if self.wait_and_type(selector, password, description="密码输入框"):
+            for by, selector, timeout in self.locators("password_input"):
+                if self.wait_and_type(selector, password, by=by, timeout=timeout, description="密码输入框"):
                     password_found = True
                     break
             
@@ -309,22 +703,10 @@ class ArkainSession:
                 return False
             
             # 查找并点击登录按钮
-            login_button_selectors = [
-                "//button[@type='submit']",
-                "//button[contains(text(), 'Login')]",
-                "//button[contains(text(), 'Sign In')]",
-                "//button[contains(text(), 'Sign in')]",
-                "//button[contains(text(), '登录')]",
-                "//input[@type='submit']",
-                "//button[contains(@class, 'primaryfill')]",
-                "//button[contains(@class, 'btn') and contains(@class, 'primary')]",
-                "//button[contains(@aria-label, 'Login')]"
-            ]
-            
             login_clicked = False
-            for selector in login_button_selectors:
+            for by, selector, _ in self.locators("login_button"):
                 try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
+                    elements = self.driver.find_elements(by, selector)
                     for element in elements:
                         if element.is_displayed():
                             # 等待按钮启用（移除disabled属性）
@@ -374,9 +756,8 @@ class ArkainSession:
             
             # 检查是否有错误消息
             try:
-                error_elements = self.driver.find_elements(By.XPATH, "//*[contains(text(), 'invalid') or contains(text(), 'error') or contains(text(), 'Invalid') or contains(text(), 'Error')]")
-                if error_elements:
-                    for element in error_elements:
+                for by, selector, _ in self.locators("login_error"):
+                    for element in self.driver.find_elements(by, selector):
                         if element.is_displayed():
                             logger.error(f"登录错误: {element.text}")
                             return False
@@ -387,13 +768,12 @@ class ArkainSession:
             self.close_popup()
             
             # 检查是否成功登录
-            if "login" not in current_url_after.lower() or "dashboard" in current_url_after.lower():
+            if not self.profile.has_keyword("login_url", current_url_after) or self.profile.has_keyword("logged_in_url", current_url_after):
                 logger.info("登录成功")
                 return True
             else:
                 # 检查页面内容
-                page_source = self.driver.page_source.lower()
-                if "dashboard" in page_source or "welcome" in page_source:
+                if self.profile.has_keyword("logged_in_page", self.driver.page_source):
                     logger.info("登录成功（通过页面内容判断）")
                     return True
                 else:
@@ -409,24 +789,14 @@ class ArkainSession:
         logger.info("导航到仪表板...")
         
         # 尝试多个可能的仪表板URL
-        dashboard_urls = [
-            f"{self.base_url}/dashboard",
-            f"{self.console_url}/dashboard",
-            "https://ap-south-1.arkain.io/dashboard",
-            "https://ap-northeast-2.arkain.io/dashboard",
-            "https://us-west-2.arkain.io/dashboard",
-            "https://eu-central-1.arkain.io/dashboard"
-        ]
-        
-        for url in dashboard_urls:
+        for url in self.profile.urls("dashboards"):
             try:
                 logger.info(f"尝试访问仪表板: {url}")
                 self.driver.get(url)
                 time.sleep(3)
                 
                 # 检查是否成功到达仪表板
-                page_source = self.driver.page_source.lower()
-                if "dashboard" in page_source or "check" in page_source:
+                if self.profile.has_keyword("dashboard_page", self.driver.page_source):
                     logger.info("成功到达仪表板")
                     return True
                 else:
@@ -447,57 +817,14 @@ class ArkainSession:
         time.sleep(2)
         
         # 常见的副按钮选择器（确认、继续、完成等）
-        secondary_button_selectors = [
-            # 确认按钮
-            "//button[contains(text(), 'Confirm')]",
-            "//button[contains(text(), 'confirm')]",
-            "//button[contains(text(), 'Continue')]",
-            "//button[contains(text(), 'continue')]",
-            "//button[contains(text(), 'OK')]",
-            "//button[contains(text(), 'ok')]",
-            "//button[contains(text(), 'Yes')]",
-            "//button[contains(text(), 'yes')]",
-            "//button[contains(text(), '确定')]",
-            "//button[contains(text(), '确认')]",
-            "//button[contains(text(), '继续')]",
-            "//button[contains(text(), '完成')]",
-            "//button[contains(text(), 'Submit')]",
-            "//button[contains(text(), 'submit')]",
-            "//button[contains(text(), 'Claim')]",
-            "//button[contains(text(), 'claim')]",
-            "//button[contains(text(), 'Get')]",
-            "//button[contains(text(), 'get')]",
-            # 通用按钮类型
-            "//button[@type='submit']",
-            "//button[contains(@class, 'primary')]",
-            "//button[contains(@class, 'confirm')]",
-            "//button[contains(@class, 'continue')]",
-            "//button[contains(@class, 'submit')]",
-            "//a[contains(@class, 'primary')]",
-            "//a[contains(@class, 'confirm')]",
-            "//a[contains(@class, 'continue')]",
-            # 包含特定属性的按钮
-            "//button[contains(@data-testid, 'confirm')]",
-            "//button[contains(@data-testid, 'submit')]",
-            "//button[contains(@data-testid, 'continue')]",
-            # 链接形式的确认
-            "//a[contains(text(), 'Confirm')]",
-            "//a[contains(text(), 'confirm')]",
-            "//a[contains(text(), 'Continue')]",
-            "//a[contains(text(), 'continue')]",
-            "//a[contains(text(), 'OK')]",
-            "//a[contains(text(), 'ok')]"
-        ]
-        
         secondary_clicked = False
-        for selector in secondary_button_selectors:
+        for by, selector, _ in self.locators("checkin_secondary_button"):
             try:
-                elements = self.driver.find_elements(By.XPATH, selector)
+                elements = self.driver.find_elements(by, selector)
                 for element in elements:
                     if element.is_displayed() and element.is_enabled():
-                        element_text = element.text.lower()
                         # 避免重复点击主签到按钮
-                        if any(keyword in element_text for keyword in ['daily check', 'check in', 'check-in']):
+                        if self.profile.has_keyword("checkin_text", element.text):
                             continue
                         
                         try:
@@ -544,58 +871,18 @@ class ArkainSession:
             page_source = self.driver.page_source
             
             # 检查是否已经签到过
-            already_checked_patterns = [
-                r'already.*check',
-                r'checked.*in',
-                r'已完成签到',
-                r'已经签到',
-                r'checked.*today'
-            ]
-            
-            for pattern in already_checked_patterns:
-                if re.search(pattern, page_source, re.IGNORECASE):
-                    logger.info("今天已经签到过了")
-                    return True
-            
-            # 查找Daily check-in按钮的多种选择器
-            checkin_selectors = [
-                # XPath选择器
-                "//button[contains(text(), 'Daily check-in')]",
-                "//button[contains(text(), 'Daily Check-in')]",
-                "//button[contains(text(), 'daily check')]",
-                "//button[contains(text(), 'Check in')]",
-                "//button[contains(text(), 'check-in')]",
-                "//a[contains(text(), 'Daily check-in')]",
-                "//a[contains(text(), 'Daily Check-in')]",
-                "//a[contains(text(), 'Check in')]",
-                "//a[contains(text(), 'check-in')]",
-                "//button[contains(@class, 'check')]",
-                "//button[contains(@id, 'check')]",
-                "//a[contains(@class, 'check')]",
-                "//a[contains(@id, 'check')]",
-                "//button[contains(@onclick, 'check')]",
-                "//a[contains(@onclick, 'check')]",
-                # CSS选择器
-                "button[class*='check']",
-                "a[class*='check']",
-                "button[id*='check']",
-                "a[id*='check']",
-                # 包含特定文本的任何元素
-                "//*[contains(text(), 'Daily check-in')]",
-                "//*[contains(text(), 'Daily Check-in')]",
-                "//*[contains(text(), 'Check in')]",
-                "//*[contains(text(), 'check-in')]"
-            ]
+            if self.profile.pattern("already_checked").search(page_source):
+                logger.info("今天已经签到过了")
+                return True
             
             # 尝试找到并点击签到按钮
             checkin_clicked = False
-            for selector in checkin_selectors:
+            for by, selector, _ in self.locators("checkin_button"):
                 try:
-                    elements = self.driver.find_elements(By.XPATH, selector) if selector.startswith('//') else self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    elements = self.driver.find_elements(by, selector)
                     for element in elements:
                         if element.is_displayed() and element.is_enabled():
-                            element_text = element.text.lower()
-                            if any(keyword in element_text for keyword in ['daily check', 'check in', 'check-in']):
+                            if self.profile.has_keyword("checkin_text", element.text):
                                 logger.info(f"找到签到按钮: {element.text}")
                                 self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
                                 time.sleep(1)
@@ -623,33 +910,15 @@ class ArkainSession:
             time.sleep(3)
             
             # 检查签到结果
-            success_patterns = [
-                r'success',
-                r'completed',
-                r'done',
-                r'签到成功',
-                r'checked.*in',
-                r'check.*complete'
-            ]
-            
-            page_source_after = self.driver.page_source.lower()
-            for pattern in success_patterns:
-                if re.search(pattern, page_source_after):
-                    logger.info("签到成功")
-                    return True
+            page_source_after = self.driver.page_source
+            if self.profile.pattern("checkin_success").search(page_source_after):
+                logger.info("签到成功")
+                return True
             
             # 检查是否有错误
-            error_patterns = [
-                r'error',
-                r'failed',
-                r'unable',
-                r'签到失败'
-            ]
-            
-            for pattern in error_patterns:
-                if re.search(pattern, page_source_after):
-                    logger.error("签到失败")
-                    return False
+            if self.profile.pattern("checkin_error").search(page_source_after):
+                logger.error("签到失败")
+                return False
             
             # 如果没有明确的成功或失败信息，假设签到成功
             logger.info("签到操作完成（无明确结果提示）")
@@ -667,6 +936,8 @@ class ArkainSession:
                 logger.info("浏览器已关闭")
             except Exception as e:
                 logger.error(f"关闭浏览器时出错: {e}")
+        # 无论quit是否成功，都确保进程树被清理
+        self.guard.release()
 
 def main():
     """主函数"""
@@ -682,34 +953,51 @@ def main():
         send_telegram(f"❌ Arkain签到失败: {error_msg}")
         return
     
-    arkain = None
+    # 清理之前运行遗留的浏览器进程
+    install_signal_handlers()
+    reap_orphans()
+    
     try:
-        # 创建会话
-        arkain = ArkainSession()
+        # 预检站点可达性，站点不可用时不启动浏览器
+        failures = preflight_check()
+        if failures:
+            raise Exception("站点不可达: " + ", ".join(f"{url} ({detail})" for url, detail in failures))
         
-        # 登录
-        if not arkain.login(EMAIL, PASSWORD):
-            raise Exception("登录失败")
-        
-        # 登录成功后直接尝试签到（Daily check-in按钮在登录后的主页面）
-        logger.info("登录成功，直接在当前页面查找签到功能")
+        for attempt in range(MAX_RESTARTS + 1):
+            # 创建会话
+            arkain = ArkainSession()
+            try:
+                # 登录
+                if not arkain.login(EMAIL, PASSWORD):
+                    raise Exception("登录失败")
+                
+                # 登录成功后直接尝试签到（Daily check-in按钮在登录后的主页面）
+                logger.info("登录成功，直接在当前页面查找签到功能")
+                
+                # 执行签到
+                if not arkain.perform_checkin():
+                    raise Exception("签到操作失败")
+                
+                # 签到已成功，即使守护随后触发也不再重复签到
+                break
+            except Exception as e:
+                if not arkain.guard.limit_exceeded:
+                    raise
+                if attempt >= MAX_RESTARTS:
+                    raise ResourceLimitExceeded(f"{arkain.guard.limit_message()}，已重启 {MAX_RESTARTS} 次") from e
+                logger.warning(f"{arkain.guard.limit_message()}，重启浏览器重试 ({attempt + 1}/{MAX_RESTARTS})")
+            finally:
+                # 确保关闭浏览器
+                arkain.close()
         
-        # 执行签到
-        if arkain.perform_checkin():
-            success_msg = "✅ Arkain.io 签到成功"
-            logger.info(success_msg)
-            send_telegram(success_msg)
-        else:
-            raise Exception("签到操作失败")
+        success_msg = "✅ Arkain.io 签到成功"
+        logger.info(success_msg)
+        send_telegram(success_msg)
             
     except Exception as e:
         error_msg = f"❌ Arkain.io 签到失败: {str(e)}"
         logger.error(error_msg)
         send_telegram(error_msg)
-    finally:
-        # 确保关闭浏览器
-        if arkain:
-            arkain.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file